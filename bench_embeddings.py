@@ -0,0 +1,157 @@
+"""
+Benchmark the RAG embedding backends (torch vs int8 ONNX) on CPU.
+
+Measures:
+  - import time of rag_mcp_server (lazy) vs the old eager cost
+    (rag_mcp_server + sentence_transformers), each in a fresh interpreter
+  - per backend, in its own fresh interpreter:
+      first-query latency (sentence_transformers import + model load + encode),
+      steady-state queries/sec
+  - retrieval recall@k against the full precision torch backend
+  - cosine similarity between torch and onnx query vectors
+
+Usage:
+    python bench_embeddings.py path/to/doc.pdf --threads 4
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+
+QUERIES = [
+    "What is supervised learning?",
+    "How does gradient descent work?",
+    "Explain overfitting and how to prevent it",
+    "What is the difference between classification and regression?",
+    "How do decision trees split the data?",
+    "What is a neural network activation function?",
+    "How is model accuracy evaluated?",
+    "What is cross validation?",
+    "Explain the bias variance tradeoff",
+    "What is unsupervised clustering?",
+]
+
+
+def measure_import_time(statement):
+    """Time `statement` in a fresh interpreter so cached modules don't skew the number"""
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=HERE)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def top_k(doc_vectors, query_vectors, k):
+    docs = doc_vectors / np.linalg.norm(doc_vectors, axis=1, keepdims=True)
+    queries = query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    scores = queries @ docs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall_at_k(hits, reference, k):
+    return np.mean([len(set(h) & set(r)) / k for h, r in zip(hits, reference)])
+
+
+def run_backend(backend, texts_path, out_path, threads, onnx_file, rounds):
+    """Child process: benchmark one backend and save the results to `out_path` (.npz)"""
+    from rag_mcp_server import SentenceTransformerEmbeddings
+
+    texts = json.loads(Path(texts_path).read_text())
+    embeddings = SentenceTransformerEmbeddings(backend=backend, threads=threads, onnx_file=onnx_file)
+
+    # Nothing heavy is loaded yet in this process, so this includes the full cold start
+    t = time.perf_counter()
+    embeddings.embed_query(QUERIES[0])
+    first_query = time.perf_counter() - t
+
+    t = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            embeddings.embed_query(query)
+    qps = rounds * len(QUERIES) / (time.perf_counter() - t)
+
+    np.savez(
+        out_path,
+        first_query=first_query,
+        qps=qps,
+        docs=np.array(embeddings.embed_documents(texts)),
+        queries=np.array([embeddings.embed_query(q) for q in QUERIES]),
+    )
+
+
+def bench_backend(backend, texts_path, tmp_dir, args):
+    """Run one backend in a fresh interpreter so it pays its own cold start costs"""
+    out_path = Path(tmp_dir) / f"{backend}.npz"
+    subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--child", backend,
+         "--texts", str(texts_path), "--out", str(out_path),
+         "--threads", str(args.threads), "--onnx-file", args.onnx_file, "--rounds", str(args.rounds)],
+        check=True, cwd=HERE,
+    )
+    return np.load(out_path)
+
+
+def main():
+    from rag_mcp_server import EMBEDDING_ONNX_FILE
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", help="PDF to build the retrieval corpus from")
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads (0 = library default)")
+    parser.add_argument("--onnx-file", default=EMBEDDING_ONNX_FILE)
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the query set for qps")
+    parser.add_argument("-k", type=int, default=4)
+    # Internal: used when the script re-invokes itself for a single backend
+    parser.add_argument("--child", choices=("torch", "onnx"), help=argparse.SUPPRESS)
+    parser.add_argument("--texts", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_backend(args.child, args.texts, args.out, args.threads, args.onnx_file, args.rounds)
+        return
+    if not args.pdf:
+        parser.error("the following arguments are required: pdf")
+
+    lazy_import = measure_import_time("import rag_mcp_server")
+    eager_import = measure_import_time("import sentence_transformers; import rag_mcp_server")
+
+    from rag_mcp_server import load_split_embedded
+    chunks = asyncio.run(load_split_embedded(args.pdf))
+    texts = [chunk.page_content for chunk in chunks]
+    print(f"Corpus: {len(texts)} chunks, {len(QUERIES)} queries, k={args.k}")
+    print(f"import rag_mcp_server (lazy):                        {lazy_import * 1000:.1f} ms")
+    print(f"import rag_mcp_server + sentence_transformers (old): {eager_import * 1000:.1f} ms\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        texts_path = Path(tmp_dir) / "texts.json"
+        texts_path.write_text(json.dumps(texts))
+        results = {backend: bench_backend(backend, texts_path, tmp_dir, args) for backend in ("torch", "onnx")}
+
+        reference = top_k(results["torch"]["docs"], results["torch"]["queries"], args.k)
+
+        print(f"{'backend':<8} {'first query (ms)':>17} {'queries/sec':>12} {'recall@' + str(args.k):>10}")
+        for backend, result in results.items():
+            hits = top_k(result["docs"], result["queries"], args.k)
+            recall = recall_at_k(hits, reference, args.k)
+            print(f"{backend:<8} {float(result['first_query']) * 1000:>17.1f} "
+                  f"{float(result['qps']):>12.1f} {recall:>10.3f}")
+
+        # Mixed case: torch built index queried with onnx vectors. The server always reindexes
+        # on a backend change; these numbers show what reusing the old index would cost.
+        mixed = top_k(results["torch"]["docs"], results["onnx"]["queries"], args.k)
+        torch_q, onnx_q = results["torch"]["queries"], results["onnx"]["queries"]
+        cosines = np.sum(torch_q * onnx_q, axis=1) / (
+            np.linalg.norm(torch_q, axis=1) * np.linalg.norm(onnx_q, axis=1)
+        )
+        print(f"\ntorch index + onnx queries recall@{args.k}: {recall_at_k(mixed, reference, args.k):.3f}")
+        print(f"torch vs onnx query cosine: min {cosines.min():.4f}, mean {cosines.mean():.4f}")
+
+
+if __name__ == "__main__":
+    main()
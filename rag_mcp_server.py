@@ -3,18 +3,88 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain.embeddings.base import Embeddings
-from sentence_transformers import SentenceTransformer
 from pathlib import Path
 import asyncio
+import json
+import os
+import threading
 
 retriever = None
 
 mcp = FastMCP('rag_based_server')
 
+PDF_PATH = r'A:\AI_Projects\AI Conversational Agent\ml_pdf_for_rag.pdf'
+INDEX_PATH = "faiss_index"
+
+# Embedding backend config (env overridable, raw strings are validated in SentenceTransformerEmbeddings)
+# "torch" -> full precision PyTorch model, "onnx" -> int8 quantized ONNX Runtime model
+EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BACKEND = os.getenv("RAG_EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_FILE = os.getenv("RAG_EMBEDDING_ONNX_FILE", "onnx/model_qint8_avx2.onnx")
+EMBEDDING_THREADS = os.getenv("RAG_EMBEDDING_THREADS", "0")  # 0 = library default
+
+# Written next to the FAISS index so we know which embeddings and PDF built it
+EMBEDDING_META_FILE = "embedding_meta.json"
+
+
 # Create custom embeddings class with async support
 class SentenceTransformerEmbeddings(Embeddings):
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name=EMBEDDING_MODEL, backend=EMBEDDING_BACKEND,
+                 onnx_file=EMBEDDING_ONNX_FILE, threads=EMBEDDING_THREADS):
+        if backend not in ("torch", "onnx"):
+            raise ValueError(
+                f"Invalid RAG_EMBEDDING_BACKEND / backend: {backend!r} (expected 'torch' or 'onnx')"
+            )
+        try:
+            parsed_threads = int(threads)
+        except (TypeError, ValueError):
+            parsed_threads = -1
+        if parsed_threads < 0:
+            raise ValueError(
+                f"Invalid RAG_EMBEDDING_THREADS / threads: {threads!r} (expected an integer >= 0)"
+            )
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.threads = parsed_threads
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """Load the model on first use so importing this module stays cheap"""
+        if self._model is None:
+            # Executor threads can hit a cold model together, only one of them should load it
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
+        # Heavy imports (torch / onnxruntime) deferred until the model is actually needed
+        from sentence_transformers import SentenceTransformer
+
+        if self.backend == "torch":
+            if self.threads > 0:
+                import torch
+                torch.set_num_threads(self.threads)
+            return SentenceTransformer(self.model_name)
+
+        model_kwargs = {"file_name": self.onnx_file, "provider": "CPUExecutionProvider"}
+        if self.threads > 0:
+            import onnxruntime as ort
+            session_options = ort.SessionOptions()
+            session_options.intra_op_num_threads = self.threads
+            model_kwargs["session_options"] = session_options
+        return SentenceTransformer(self.model_name, backend="onnx", model_kwargs=model_kwargs)
+
+    def signature(self):
+        """Describes the embedding space this instance produces (saved with the index)"""
+        return {
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "onnx_file": self.onnx_file if self.backend == "onnx" else None,
+        }
     
     def embed_documents(self, texts):
         return self.model.encode(texts).tolist()
@@ -33,6 +103,33 @@ class SentenceTransformerEmbeddings(Embeddings):
         return await loop.run_in_executor(None, self.embed_query, text)
 
 
+def source_fingerprint(source_path: str):
+    """Identifies the PDF an index was built from, so edits or replacements trigger a reindex"""
+    stat = Path(source_path).stat()
+    return {
+        "path": str(Path(source_path).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def is_index_compatible(embeddings, source_path: str = PDF_PATH, path: str = INDEX_PATH):
+    """Check whether the saved index was built from `source_path` with the same embeddings"""
+    meta_path = Path(path) / EMBEDDING_META_FILE
+    try:
+        saved = json.loads(meta_path.read_text())
+        current_source = source_fingerprint(source_path)
+    except (OSError, ValueError):
+        # Missing / truncated meta file or unreadable PDF -> rebuild rather than crash
+        return False
+    if not isinstance(saved, dict):
+        return False
+
+    # int8 and fp32 vectors are close but not identical, so any backend or weights
+    # change reindexes instead of mixing embedding spaces
+    return saved.get("embeddings") == embeddings.signature() and saved.get("source") == current_source
+
+
 async def load_split_embedded(path: str):
     """Load and split PDF into chunks"""
     loop = asyncio.get_event_loop()
@@ -63,36 +160,67 @@ async def create_vectorstore(chunks, embeddings):
     return vectorstore
 
 
-async def save_vectorstore(vectorstore, path: str = "faiss_index"):
-    """Save vectorstore to disk asynchronously"""
+async def save_vectorstore(vectorstore, embeddings, source_path: str = PDF_PATH, path: str = INDEX_PATH):
+    """Save vectorstore to disk asynchronously, along with the embedding and source metadata"""
     loop = asyncio.get_event_loop()
+    meta_path = Path(path) / EMBEDDING_META_FILE
+
+    # Drop the old meta first so a crash mid-save leaves the index marked as stale
+    meta_path.unlink(missing_ok=True)
     await loop.run_in_executor(None, vectorstore.save_local, path)
+
+    meta = {"embeddings": embeddings.signature(), "source": source_fingerprint(source_path)}
+    tmp_path = meta_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(meta))
+    os.replace(tmp_path, meta_path)
     print(f"FAISS vector store saved to '{path}' folder!")
 
 
+async def load_vectorstore(embeddings, source_path: str = PDF_PATH, path: str = INDEX_PATH):
+    """Load a previously saved vectorstore, or None if missing / stale / built with other embeddings"""
+    loop = asyncio.get_event_loop()
+    if not Path(path).exists():
+        return None
+
+    compatible = await loop.run_in_executor(None, is_index_compatible, embeddings, source_path, path)
+    if not compatible:
+        print(f"Index in '{path}' is stale or was built with different embeddings, reindexing...")
+        return None
+
+    # Index files are written by this server, so deserializing them is safe
+    return await loop.run_in_executor(
+        None,
+        lambda: FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+    )
+
+
 async def main():
     """Main async function orchestrating the RAG pipeline"""
     
-    # Step 1: Load and split PDF
-    print("Loading and splitting PDF...")
-    chunks = await load_split_embedded(
-        r'A:\AI_Projects\AI Conversational Agent\ml_pdf_for_rag.pdf'
-    )
-    print(f"Created {len(chunks)} chunks")
-
-    # Step 2: Initialize embeddings
-    print("Initializing embeddings model...")
+    # Step 1: Initialize embeddings (model itself loads lazily on first encode)
     embeddings = SentenceTransformerEmbeddings()
+    print(f"Initializing embeddings ({embeddings.backend} backend)...")
+
+    # Step 2: Reuse the saved index if it matches the current embeddings and PDF
+    vectorstore = await load_vectorstore(embeddings, PDF_PATH)
+
+    if vectorstore is None:
+        # Step 3: Load and split PDF
+        print("Loading and splitting PDF...")
+        chunks = await load_split_embedded(PDF_PATH)
+        print(f"Created {len(chunks)} chunks")
 
-    # Step 3: Create FAISS vector store
-    print("Creating FAISS vector store...")
-    vectorstore = await create_vectorstore(chunks, embeddings)
+        # Step 4: Create FAISS vector store
+        print("Creating FAISS vector store...")
+        vectorstore = await create_vectorstore(chunks, embeddings)
 
-    # Step 4: Save to disk
-    print("Saving vector store...")
-    await save_vectorstore(vectorstore)
+        # Step 5: Save to disk
+        print("Saving vector store...")
+        await save_vectorstore(vectorstore, embeddings, PDF_PATH)
+    else:
+        print(f"Loaded existing FAISS vector store from '{INDEX_PATH}'")
     
-    # Step 5: Create retriever
+    # Step 6: Create retriever
     retriever = vectorstore.as_retriever(
         search_type='similarity', 
         search_kwargs={'k': 4}